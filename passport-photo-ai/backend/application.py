@@ -10,7 +10,9 @@ from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 import io
 import base64
 import json
+import logging
 import os
+import sys
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 import random
@@ -43,6 +45,13 @@ except ImportError:
     HEIC_SUPPORT = False
     print("HEIC support not available")
 
+# Faster JSON encoding for analytics log lines, optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # rembg support with lightweight model
 try:
     from rembg import remove, new_session
@@ -67,9 +76,49 @@ application = Flask(__name__)
 CORS(application, origins=['*'], methods=['GET', 'POST', 'OPTIONS'], allow_headers=['Content-Type'])
 application.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max
 
+# Analytics events go to stdout as one "Analytics Event: {json}" line each (picked up by EB logs)
+analytics_logger = logging.getLogger('analytics')
+analytics_logger.setLevel(logging.INFO)
+analytics_logger.propagate = False
+if not analytics_logger.handlers:
+    _analytics_handler = logging.StreamHandler(sys.stdout)
+    _analytics_handler.setFormatter(logging.Formatter('Analytics Event: %(message)s'))
+    analytics_logger.addHandler(_analytics_handler)
+
 # Initialize AWS SES client
 ses_client = boto3.client('ses', region_name='us-east-1')
 
+# rembg models in order of size (smallest first)
+REMBG_MODEL_PRIORITY = [
+    'silueta',      # Smallest model (~1.7MB)
+    'u2netp',       # Small model (~4.7MB) 
+    'u2net_human_seg',  # Human-focused model (~176MB)
+    'u2net'         # Default model (~176MB)
+]
+
+# Loaded on the first background removal request and shared by all processors
+_rembg_session = None
+_rembg_model_name = None
+
+def get_rembg_session():
+    """Return (session, model_name) for the first rembg model that loads, or (None, None)"""
+    global _rembg_session, _rembg_model_name
+    if _rembg_session is not None:
+        return _rembg_session, _rembg_model_name
+    
+    for model_name in REMBG_MODEL_PRIORITY:
+        try:
+            print(f"Trying rembg model: {model_name}")
+            _rembg_session = new_session(model_name)
+            _rembg_model_name = model_name
+            print(f"Successfully loaded model: {model_name}")
+            break
+        except Exception as e:
+            print(f"Failed to load model {model_name}: {e}")
+            continue
+    
+    return _rembg_session, _rembg_model_name
+
 class PassportPhotoProcessor:
     PASSPORT_SIZE_PIXELS = (1200, 1200)  # High resolution output
     HEAD_HEIGHT_MIN = 0.50
@@ -398,27 +447,7 @@ class PassportPhotoProcessor:
             return img
             
         try:
-            # Try models in order of size (smallest first)
-            model_priority = [
-                'silueta',      # Smallest model (~1.7MB)
-                'u2netp',       # Small model (~4.7MB) 
-                'u2net_human_seg',  # Human-focused model (~176MB)
-                'u2net'         # Default model (~176MB)
-            ]
-            
-            session = None
-            model_used = None
-            
-            for model_name in model_priority:
-                try:
-                    print(f"Trying rembg model: {model_name}")
-                    session = new_session(model_name)
-                    model_used = model_name
-                    print(f"Successfully loaded model: {model_name}")
-                    break
-                except Exception as e:
-                    print(f"Failed to load model {model_name}: {e}")
-                    continue
+            session, model_used = get_rembg_session()
             
             if session is None:
                 print("All rembg models failed to load, skipping background removal")
@@ -1056,7 +1085,9 @@ def log_event():
             return jsonify({"error": "No event data provided"}), 400
         
         event_data['timestamp'] = datetime.now(timezone.utc).isoformat()
-        print(f"Analytics Event: {json.dumps(event_data)}")
+        # Serialize once and emit the whole event as a single line in one write
+        event_json = orjson.dumps(event_data).decode('utf-8') if ORJSON_AVAILABLE else json.dumps(event_data)
+        analytics_logger.info(event_json)
         
         return jsonify({"success": True, "message": "Event logged"}), 200
         
@@ -5,12 +5,13 @@ Optimized for AWS Elastic Beanstalk deployment
 """
 
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 import io
-import base64
 import json
 import os
+import functools
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 import logging
@@ -30,6 +31,21 @@ except ImportError as e:
     OPENCV_AVAILABLE = False
 
 
+# Faster JSON serialization for API responses, optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# SIMD base64 encoder for the processed image payload, optional (same API as stdlib base64)
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+
 # HEIC image support
 try:
     from pillow_heif import register_heif_opener
@@ -42,7 +58,30 @@ except ImportError:
 
 load_dotenv()
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson
+
+    datetime/date and dataclass values are passed through to Flask's default(),
+    so they serialize as with the stock provider (e.g. RFC 822 dates). Integers
+    wider than 64 bits raise instead of serializing.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = (orjson.OPT_NON_STR_KEYS
+                  | orjson.OPT_PASSTHROUGH_DATETIME
+                  | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 application = Flask(__name__)
+if ORJSON_AVAILABLE:
+    application.json = OrjsonProvider(application)
 CORS(application, origins=['*'], methods=['GET', 'POST', 'OPTIONS'], allow_headers=['Content-Type'])
 application.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max
 
@@ -572,8 +611,10 @@ class HybridPassportPhotoProcessor:
             print(f"Watermark error: {e}")
             return img
 
-# Initialize processor with learned profile enabled by default
-processor = HybridPassportPhotoProcessor(use_learned_profile=True)
+@functools.lru_cache(maxsize=2)
+def get_processor(use_learned_profile=True):
+    """Build the processor on first use and reuse it; one instance per feature flag value"""
+    return HybridPassportPhotoProcessor(use_learned_profile=use_learned_profile)
 
 # Simple in-memory store for OTPs
 otp_store = {}
@@ -713,19 +754,20 @@ def full_workflow():
         return jsonify({"error": "No image provided"}), 400
     
     file = request.files['image']
-    print(f"File received: {file.filename}, size: {len(file.read())} bytes")
-    file.seek(0)  # Reset file pointer after reading size
     
     temp_path = f"temp_{datetime.now().timestamp()}"
     file.save(temp_path)
+    # Size from the saved file instead of reading the whole upload into memory
+    file_size = file.content_length or os.path.getsize(temp_path)
+    print(f"File received: {file.filename}, size: {file_size} bytes")
     print(f"File saved to: {temp_path}")
     
     try:
         # Check if learned profile should be used (feature flag)
         use_learned_profile = request.form.get('use_learned_profile', 'true').lower() == 'true'
         
-        # Create processor with appropriate settings
-        current_processor = processor if use_learned_profile else HybridPassportPhotoProcessor(use_learned_profile=False)
+        # Reuse the cached processor matching the feature flag
+        current_processor = get_processor(use_learned_profile)
         
         # Enhanced face detection
         face_analysis = current_processor.enhanced_face_detection(temp_path)
@@ -767,7 +809,7 @@ def full_workflow():
         return jsonify({
             "success": True, "feasible": True,
             "analysis": {"face_detection": face_analysis, "ai_analysis": ai_analysis},
-            "processed_image": base64.b64encode(processed_buffer.getvalue()).decode('utf-8'),
+            "processed_image": base64.b64encode(processed_buffer.getbuffer()).decode('ascii'),
             "message": "Photo successfully processed with enhanced analysis.",
             "processing_time": processing_time
         })
@@ -782,16 +824,9 @@ def full_workflow():
         if os.path.exists(temp_path):
             os.remove(temp_path)
 
-@application.route('/api/log-event', methods=['POST', 'OPTIONS'])
+@application.route('/api/log-event', methods=['POST'])
 def log_event():
-    if request.method == 'OPTIONS':
-        # Handle CORS preflight request
-        response = jsonify({'status': 'ok'})
-        response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
-        response.headers.add('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        return response
-    
+    # CORS preflight (OPTIONS) is answered by the app-wide flask-cors setup
     try:
         event_data = request.json
         if not event_data:
@@ -29,9 +29,9 @@ class QualityMetrics:
     background_uniformity: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ValidationResult:
-    """Results from quality validation"""
+    """Results from quality validation (immutable; one is kept per validation in history)"""
     overall_score: float
     grade: str  # A, B, C, D, F
     dimension_score: float
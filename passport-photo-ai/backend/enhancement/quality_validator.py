@@ -3,8 +3,11 @@ Quality Validation System
 Validates images against gold standard passport photo requirements
 """
 
+import os
 import numpy as np
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
 import logging
 from .data_models import QualityMetrics, ValidationResult, FaceData
 
@@ -41,61 +44,91 @@ class QualityValidator:
         Returns:
             ValidationResult with detailed scoring
         """
-        if image is None or image.size == 0:
+        if image is None or image.size == 0 or image.ndim < 2:
             return self._create_error_result("Invalid input image")
         
-        try:
-            # Calculate individual scores
-            dimension_score = self._calculate_dimension_score(image)
-            background_score = self._calculate_background_score(quality_metrics)
-            face_compliance_score = self._calculate_face_compliance_score(face_data, image.shape)
-            image_quality_score = self._calculate_image_quality_score(quality_metrics)
-            
-            # Calculate overall score using weighted formula
-            overall_score = (
-                dimension_score * self.DIMENSION_WEIGHT +
-                background_score * self.BACKGROUND_WEIGHT +
-                face_compliance_score * self.FACE_COMPLIANCE_WEIGHT +
-                image_quality_score * self.IMAGE_QUALITY_WEIGHT
-            )
-            
-            # Determine grade
-            grade = self._calculate_grade(overall_score)
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                dimension_score, background_score, face_compliance_score, image_quality_score
-            )
-            
-            # Determine if passport ready
-            is_passport_ready = overall_score >= 0.8 and face_compliance_score >= 0.8
-            
-            result = ValidationResult(
-                overall_score=overall_score,
-                grade=grade,
-                dimension_score=dimension_score,
-                background_score=background_score,
-                face_compliance_score=face_compliance_score,
-                image_quality_score=image_quality_score,
-                recommendations=recommendations,
-                is_passport_ready=is_passport_ready
-            )
-            
-            # Store in history for monitoring
-            self.validation_history.append(result)
-            
-            logging.info(f"Validation completed: Overall score {overall_score:.1%} (Grade: {grade})")
-            
-            return result
+        if quality_metrics is None:
+            return self._create_error_result("Missing quality metrics")
+        
+        # Calculate individual scores
+        dimension_score = self._calculate_dimension_score(image)
+        background_score = self._calculate_background_score(quality_metrics)
+        face_compliance_score = self._calculate_face_compliance_score(face_data, image.shape)
+        image_quality_score = self._calculate_image_quality_score(quality_metrics)
+        
+        # Calculate overall score using weighted formula
+        overall_score = (
+            dimension_score * self.DIMENSION_WEIGHT +
+            background_score * self.BACKGROUND_WEIGHT +
+            face_compliance_score * self.FACE_COMPLIANCE_WEIGHT +
+            image_quality_score * self.IMAGE_QUALITY_WEIGHT
+        )
+        
+        # Determine grade
+        grade = self._calculate_grade(overall_score)
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(
+            dimension_score, background_score, face_compliance_score, image_quality_score
+        )
+        
+        # Determine if passport ready
+        is_passport_ready = overall_score >= 0.8 and face_compliance_score >= 0.8
+        
+        result = ValidationResult(
+            overall_score=overall_score,
+            grade=grade,
+            dimension_score=dimension_score,
+            background_score=background_score,
+            face_compliance_score=face_compliance_score,
+            image_quality_score=image_quality_score,
+            recommendations=recommendations,
+            is_passport_ready=is_passport_ready
+        )
+        
+        # Store in history for monitoring
+        self.validation_history.append(result)
+        
+        logging.info(f"Validation completed: Overall score {overall_score:.1%} (Grade: {grade})")
+        
+        return result
+    
+    def validate_batch(self, images: List[np.ndarray],
+                       metrics_list: List[QualityMetrics],
+                       face_list: Optional[List[FaceData]] = None,
+                       max_workers: int = None) -> List[ValidationResult]:
+        """
+        Validate many images concurrently (offline evaluation, A/B runs)
+        
+        Args:
+            images: Input images
+            metrics_list: Quality metrics, one per image
+            face_list: Face detection results, one per image (optional)
+            max_workers: Thread count (defaults to CPU count)
             
-        except Exception as e:
-            logging.error(f"Validation failed: {e}")
-            return self._create_error_result(f"Validation error: {str(e)}")
+        Returns:
+            ValidationResults in the same order as the input images
+        """
+        if face_list is None:
+            face_list = [None] * len(images)
+        
+        if len(images) <= 1:
+            return [self.validate_against_gold_standard(*args)
+                    for args in zip(images, metrics_list, face_list)]
+        
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(self.validate_against_gold_standard,
+                                     images, metrics_list, face_list))
     
     def _calculate_dimension_score(self, image: np.ndarray) -> float:
         """Calculate dimension compliance score"""
         height, width = image.shape[:2]
-        
+        return self._dimension_score_for(int(width), int(height))
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _dimension_score_for(width: int, height: int) -> float:
+        """Dimension score for a (width, height) pair, memoized since few shapes occur"""
         # Perfect score for 1200x1200 (passport standard)
         if width == 1200 and height == 1200:
             return 1.0
@@ -3,12 +3,8 @@ Pytest configuration and shared fixtures for backend tests.
 """
 import pytest
 import os
-import sys
 from pathlib import Path
 
-# Add parent directory to path so we can import application module
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 # Get the fixtures directory path
 FIXTURES_DIR = Path(__file__).parent / 'fixtures'
 
@@ -91,6 +87,27 @@ def square_image(fixtures_dir):
     return str(fixtures_dir / 'square_1000x1000.jpg')
 
 
+@pytest.fixture(scope="module")
+def sample_image_with_face():
+    """Return (in-memory JPEG, face_bbox) for a 1200x1200 sample image built once per module."""
+    import io
+    from PIL import Image
+    
+    # process_to_passport_photo only calls Image.open, which takes any file-like object
+    image_buffer = io.BytesIO()
+    Image.new('RGB', (1200, 1200), color=(200, 150, 100)).save(image_buffer, "JPEG", quality=75)
+    image_buffer.seek(0)
+    
+    # Mock face bbox in center
+    face_bbox = {
+        'x': 400,
+        'y': 300,
+        'width': 400,
+        'height': 500
+    }
+    return image_buffer, face_bbox
+
+
 # Hypothesis settings for property-based tests
 from hypothesis import settings, Verbosity
 
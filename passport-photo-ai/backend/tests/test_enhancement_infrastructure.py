@@ -294,4 +294,35 @@ class TestEnhancementIntegration:
         
         result = validator.validate_against_gold_standard(test_image, metrics, face_data)
         assert isinstance(result, ValidationResult)
-        assert result.face_compliance_score > 0  # Should have some score due to face_data
\ No newline at end of file
+        assert result.face_compliance_score > 0  # Should have some score due to face_data
+    
+    def test_dimension_score_by_shape(self):
+        """Test dimension scoring for passport, square, rectangular and small images"""
+        validator = QualityValidator()
+        
+        assert validator._calculate_dimension_score(np.zeros((1200, 1200, 3), dtype=np.uint8)) == 1.0
+        assert validator._calculate_dimension_score(np.zeros((800, 800, 3), dtype=np.uint8)) == 0.9
+        assert validator._calculate_dimension_score(np.zeros((800, 700, 3), dtype=np.uint8)) == 0.7
+        assert validator._calculate_dimension_score(np.zeros((1000, 600, 3), dtype=np.uint8)) == 0.5
+        assert validator._calculate_dimension_score(np.zeros((100, 100, 3), dtype=np.uint8)) == 0.3
+    
+    def test_validate_batch_matches_sequential_validation(self):
+        """Test that batch validation returns the same results, in order, as single validation"""
+        validator = QualityValidator()
+        images = [
+            np.zeros((1200, 1200, 3), dtype=np.uint8),
+            np.zeros((800, 700, 3), dtype=np.uint8),
+            np.zeros((100, 100, 3), dtype=np.uint8),
+        ]
+        metrics_list = [
+            QualityMetrics(sharpness_score=0.8, contrast_score=0.5, background_uniformity=0.95),
+            QualityMetrics(sharpness_score=0.3, noise_level=0.03, contrast_score=0.1),
+            QualityMetrics(),
+        ]
+        face_list = [FaceData(bounding_box=(0, 0, 10, 10), confidence=0.97, face_size_ratio=0.75), None, None]
+        
+        batch_results = validator.validate_batch(images, metrics_list, face_list)
+        expected = [validator.validate_against_gold_standard(*args)
+                    for args in zip(images, metrics_list, face_list)]
+        
+        assert batch_results == expected
@@ -9,10 +9,6 @@ import cv2
 import numpy as np
 import json
 import os
-import sys
-
-# Add parent directory to path to import learning script
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from learn_from_samples import PassportPhotoAnalyzer, learn_from_directory
 
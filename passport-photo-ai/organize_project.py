@@ -6,8 +6,15 @@ Cleans up and organizes files to maintain a clean project structure
 
 import os
 import shutil
-import glob
+import re
 from datetime import datetime
+from pathlib import Path
+
+# Test output images: test_*/debug_* (.jpg/.png), user_*.jpg, and *_result/*_output/*_removed.jpg
+# (hidden files excluded, as glob's * would)
+TEST_OUTPUT_IMAGE_RE = re.compile(
+    r'^(?!\.)(?:(?:test|debug)_.*\.(?:jpg|png)|user_.*\.jpg|.*_(?:result|output|removed)\.jpg)$'
+)
 
 
 class ProjectOrganizer:
@@ -18,6 +25,13 @@ class ProjectOrganizer:
         self.backup_dir = "archived_files"
         self.temp_outputs_dir = "temp_outputs"
         
+    def _fast_move(self, src, dst):
+        """Move with a single rename; fall back to shutil.move across filesystems"""
+        try:
+            os.replace(src, dst)
+        except OSError:
+            shutil.move(src, dst)
+    
     def create_directories(self):
         """Create organization directories if they don't exist"""
         dirs_to_create = [
@@ -37,25 +51,14 @@ class ProjectOrganizer:
         """Move test output images to temp_outputs directory"""
         print("\n📁 Organizing test output images...")
         
-        # Patterns for test output images
-        test_image_patterns = [
-            "test_*.jpg",
-            "test_*.png", 
-            "debug_*.jpg",
-            "debug_*.png",
-            "user_*.jpg",
-            "*_result.jpg",
-            "*_output.jpg",
-            "*_removed.jpg"
-        ]
-        
+        # One directory read; each entry is matched against all the output patterns at once
         moved_count = 0
-        for pattern in test_image_patterns:
-            for file_path in glob.glob(pattern):
-                if os.path.isfile(file_path):
-                    dest_path = os.path.join(self.temp_outputs_dir, os.path.basename(file_path))
-                    shutil.move(file_path, dest_path)
-                    print(f"  Moved: {file_path} → {dest_path}")
+        with os.scandir(self.root_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and TEST_OUTPUT_IMAGE_RE.match(entry.name):
+                    dest_path = os.path.join(self.temp_outputs_dir, entry.name)
+                    self._fast_move(entry.path, dest_path)
+                    print(f"  Moved: {entry.name} → {dest_path}")
                     moved_count += 1
         
         print(f"✅ Moved {moved_count} test output images")
@@ -82,7 +85,7 @@ class ProjectOrganizer:
         for script in debug_scripts:
             if os.path.exists(script):
                 dest_path = os.path.join("archived_test_files", script)
-                shutil.move(script, dest_path)
+                self._fast_move(script, dest_path)
                 print(f"  Moved: {script} → {dest_path}")
                 moved_count += 1
         
@@ -116,7 +119,7 @@ class ProjectOrganizer:
         for script in deployment_scripts:
             if os.path.exists(script):
                 dest_path = os.path.join("deployment/scripts", script)
-                shutil.move(script, dest_path)
+                self._fast_move(script, dest_path)
                 print(f"  Moved: {script} → {dest_path}")
                 moved_count += 1
         
@@ -136,7 +139,7 @@ class ProjectOrganizer:
         for doc in deployment_docs:
             if os.path.exists(doc):
                 dest_path = os.path.join("deployment/docs", doc)
-                shutil.move(doc, dest_path)
+                self._fast_move(doc, dest_path)
                 print(f"  Moved: {doc} → {dest_path}")
                 moved_count += 1
         
@@ -162,19 +165,6 @@ class ProjectOrganizer:
             "application-with-email.py"
         ]
         
-        archived_backend_dir = os.path.join("archived_files", "backend_versions")
-        if not os.path.exists(archived_backend_dir):
-            os.makedirs(archived_backend_dir)
-        
-        moved_count = 0
-        for app_file in old_applications:
-            app_path = os.path.join(backend_dir, app_file)
-            if os.path.exists(app_path):
-                dest_path = os.path.join(archived_backend_dir, app_file)
-                shutil.move(app_path, dest_path)
-                print(f"  Moved: {app_path} → {dest_path}")
-                moved_count += 1
-        
         # Move old test files
         old_test_files = [
             "test_deployed_app_backup.py",
@@ -183,14 +173,6 @@ class ProjectOrganizer:
             "test_hybrid_functionality.py"
         ]
         
-        for test_file in old_test_files:
-            test_path = os.path.join(backend_dir, test_file)
-            if os.path.exists(test_path):
-                dest_path = os.path.join("archived_test_files", test_file)
-                shutil.move(test_path, dest_path)
-                print(f"  Moved: {test_path} → {dest_path}")
-                moved_count += 1
-        
         # Move test output images from backend
         backend_test_images = [
             "test_bg_removal_local.jpg",
@@ -199,13 +181,26 @@ class ProjectOrganizer:
             "test_watermark_3x_local.jpg"
         ]
         
-        for img_file in backend_test_images:
-            img_path = os.path.join(backend_dir, img_file)
-            if os.path.exists(img_path):
-                dest_path = os.path.join(self.temp_outputs_dir, img_file)
-                shutil.move(img_path, dest_path)
-                print(f"  Moved: {img_path} → {dest_path}")
-                moved_count += 1
+        archived_backend_dir = os.path.join("archived_files", "backend_versions")
+        if not os.path.exists(archived_backend_dir):
+            os.makedirs(archived_backend_dir)
+        
+        # Destination for every file that should leave the backend directory
+        destinations = {}
+        destinations.update((name, archived_backend_dir) for name in old_applications)
+        destinations.update((name, "archived_test_files") for name in old_test_files)
+        destinations.update((name, self.temp_outputs_dir) for name in backend_test_images)
+        
+        # One directory read instead of an exists() check per candidate
+        moved_count = 0
+        with os.scandir(backend_dir) as entries:
+            for entry in entries:
+                dest_dir = destinations.get(entry.name)
+                if dest_dir and entry.is_file():
+                    dest_path = os.path.join(dest_dir, entry.name)
+                    self._fast_move(entry.path, dest_path)
+                    print(f"  Moved: {entry.path} → {dest_path}")
+                    moved_count += 1
         
         print(f"✅ Cleaned {moved_count} files from backend directory")
     
@@ -257,9 +252,8 @@ Use these files for deploying and managing the application in various environmen
         
         for dir_name, content in readme_contents.items():
             if os.path.exists(dir_name):
-                readme_path = os.path.join(dir_name, "README.md")
-                with open(readme_path, 'w') as f:
-                    f.write(content)
+                readme_path = Path(dir_name) / "README.md"
+                readme_path.write_text(content)
                 print(f"  Created: {readme_path}")
     
     def update_gitignore(self):
@@ -287,22 +281,16 @@ Use these files for deploying and managing the application in various environmen
         ]
         
         # Read current .gitignore
-        gitignore_path = ".gitignore"
-        existing_content = ""
-        if os.path.exists(gitignore_path):
-            with open(gitignore_path, 'r') as f:
-                existing_content = f.read()
+        gitignore_path = Path(".gitignore")
+        existing_content = gitignore_path.read_text() if gitignore_path.exists() else ""
+        existing_lines = {line.strip() for line in existing_content.splitlines()}
         
-        # Add new entries if they don't exist
-        updated = False
-        for entry in gitignore_additions:
-            if entry.strip() and entry.strip() not in existing_content:
-                existing_content += entry + "\n"
-                updated = True
+        # Add new entries if they don't exist (appended in order, existing content untouched)
+        new_entries = [entry for entry in gitignore_additions
+                       if entry.strip() and entry.strip() not in existing_lines]
         
-        if updated:
-            with open(gitignore_path, 'w') as f:
-                f.write(existing_content)
+        if new_entries:
+            gitignore_path.write_text(existing_content + "".join(entry + "\n" for entry in new_entries))
             print("✅ Updated .gitignore with temporary file patterns")
         else:
             print("✅ .gitignore already up to date")
@@ -5,36 +5,93 @@ Checks current month's spending to ensure we stay under $10
 """
 
 import boto3
+import functools
 import json
+import os
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-def check_current_costs():
-    """Check current month's AWS costs"""
+# One session for the whole run so credentials are resolved (and cached) once
+_session = boto3.Session()
+
+@functools.lru_cache(maxsize=None)
+def _ce():
+    """Shared Cost Explorer client"""
+    return _session.client('ce', region_name='us-east-1')
+
+@functools.lru_cache(maxsize=None)
+def _ec2():
+    """Shared EC2 client"""
+    return _session.client('ec2', region_name='us-east-1')
+
+# Cost Explorer bills every request, so reuse a recent report for an hour
+COST_CACHE_FILE = os.path.expanduser('~/.cache/aws_cost_report.json')
+COST_CACHE_TTL = 3600
+
+def _fetch_service_costs(start, end):
+    """Fetch per-service BlendedCost for the period, following every result page"""
+    request = {
+        'TimePeriod': {'Start': start, 'End': end},
+        'Granularity': 'MONTHLY',
+        'Metrics': ['BlendedCost'],
+        'GroupBy': [{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+    }
+    
+    results_by_time = []
+    while True:
+        response = _ce().get_cost_and_usage(**request)
+        results_by_time.extend(response['ResultsByTime'])
+        token = response.get('NextPageToken')
+        if not token:
+            break
+        request['NextPageToken'] = token
+    
+    service_costs = {}
+    for period in results_by_time:
+        for group in period['Groups']:
+            service = group['Keys'][0]
+            cost = Decimal(group['Metrics']['BlendedCost']['Amount'])
+            service_costs[service] = service_costs.get(service, Decimal('0')) + cost
+    return service_costs
+
+def _get_service_costs(start, end):
+    """Per-service costs, served from the on-disk cache while it is fresh"""
+    key = f"{start}:{end}"
+    try:
+        with open(COST_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == key and time.time() - cached.get('fetched_at', 0) < COST_CACHE_TTL:
+            print("📦 Using cached cost report (less than 1 hour old)")
+            return {service: Decimal(amount) for service, amount in cached['costs'].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    service_costs = _fetch_service_costs(start, end)
+    
+    try:
+        os.makedirs(os.path.dirname(COST_CACHE_FILE), exist_ok=True)
+        with open(COST_CACHE_FILE, 'w') as f:
+            json.dump({
+                'key': key,
+                'fetched_at': time.time(),
+                'costs': {service: str(cost) for service, cost in service_costs.items()}
+            }, f)
+    except OSError as e:
+        print(f"⚠️  Could not cache cost report: {e}")
+    
+    return service_costs
+
+def check_current_costs(now=None):
+    """Check current month's AWS costs; returns (total, per-service costs)"""
     try:
-        # Create Cost Explorer client
-        ce_client = boto3.client('ce', region_name='us-east-1')
-        
         # Get current month dates
-        today = datetime.now()
-        start_of_month = today.replace(day=1).strftime('%Y-%m-%d')
-        end_of_month = today.strftime('%Y-%m-%d')
+        today = now or datetime.now()
+        start_of_month = f"{today:%Y-%m}-01"
+        end_of_month = f"{today:%Y-%m-%d}"
         
-        # Get cost and usage
-        response = ce_client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start_of_month,
-                'End': end_of_month
-            },
-            Granularity='MONTHLY',
-            Metrics=['BlendedCost'],
-            GroupBy=[
-                {
-                    'Type': 'DIMENSION',
-                    'Key': 'SERVICE'
-                }
-            ]
-        )
+        # Get cost and usage (all pages, cached for an hour)
+        service_costs = _get_service_costs(start_of_month, end_of_month)
         
         print("💰 AWS COST REPORT")
         print("=" * 40)
@@ -42,13 +99,10 @@ def check_current_costs():
         
         total_cost = Decimal('0')
         
-        if response['ResultsByTime']:
-            for group in response['ResultsByTime'][0]['Groups']:
-                service = group['Keys'][0]
-                cost = Decimal(group['Metrics']['BlendedCost']['Amount'])
-                if cost > 0:
-                    print(f"💸 {service}: ${cost:.2f}")
-                    total_cost += cost
+        for service, cost in service_costs.items():
+            if cost > 0:
+                print(f"💸 {service}: ${cost:.2f}")
+                total_cost += cost
         
         print("-" * 40)
         print(f"💵 Total Cost This Month: ${total_cost:.2f}")
@@ -64,36 +118,42 @@ def check_current_costs():
         else:
             print("✅ GOOD: Well within budget limits.")
         
-        return float(total_cost)
+        return float(total_cost), service_costs
         
     except Exception as e:
         print(f"❌ Error checking costs: {e}")
         print("💡 Make sure you have Cost Explorer permissions")
-        return None
+        return None, None
+
+EC2_COMPUTE_SERVICE = 'Amazon Elastic Compute Cloud - Compute'
 
-def check_free_tier_usage():
+def check_free_tier_usage(service_costs=None, now=None):
     """Check free tier usage (simplified)"""
     print("\n🆓 FREE TIER USAGE ESTIMATES")
     print("=" * 40)
     
+    # Cost Explorer lists EC2 compute whenever there was any usage, even at $0 on
+    # the free tier, so its absence means there is nothing to count
+    if service_costs is not None and EC2_COMPUTE_SERVICE not in service_costs:
+        print("🖥️  Running t3.micro instances: 0 (no EC2 usage this month)")
+        return
+    
     try:
         # EC2 usage (Elastic Beanstalk)
-        ec2_client = boto3.client('ec2', region_name='us-east-1')
-        instances = ec2_client.describe_instances(
+        # Page through the matches and keep only the instance IDs
+        paginator = _ec2().get_paginator('describe_instances')
+        pages = paginator.paginate(
             Filters=[
                 {'Name': 'instance-state-name', 'Values': ['running']},
                 {'Name': 'instance-type', 'Values': ['t3.micro', 't2.micro']}
             ]
         )
-        
-        running_instances = 0
-        for reservation in instances['Reservations']:
-            running_instances += len(reservation['Instances'])
+        running_instances = sum(1 for _ in pages.search('Reservations[].Instances[].InstanceId'))
         
         print(f"🖥️  Running t3.micro instances: {running_instances}")
         
         if running_instances > 0:
-            hours_used_estimate = running_instances * 24 * datetime.now().day
+            hours_used_estimate = running_instances * 24 * (now or datetime.now()).day
             free_tier_hours = 750
             print(f"⏰ Estimated hours used this month: {hours_used_estimate}")
             print(f"🆓 Free tier hours remaining: {max(0, free_tier_hours - hours_used_estimate)}")
@@ -109,8 +169,11 @@ def main():
     print("🔍 CHECKING AWS COSTS AND USAGE")
     print("=" * 50)
     
-    current_cost = check_current_costs()
-    check_free_tier_usage()
+    # One clock read shared by every check in this run
+    now = datetime.now()
+    
+    current_cost, service_costs = check_current_costs(now)
+    check_free_tier_usage(service_costs, now)
     
     print("\n📋 COST OPTIMIZATION TIPS:")
     print("- Keep only 1 t3.micro instance running")
@@ -4,12 +4,37 @@ Check domain setup for faizuddinshaik.com
 Verifies DNS records and SSL certificate
 """
 
+import re
 import socket
 import ssl
 import requests
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import dns.resolver
+    DNSPYTHON_AVAILABLE = True
+except ImportError:
+    DNSPYTHON_AVAILABLE = False
+
+# Shared session so repeated HTTPS checks reuse pooled connections and TLS sessions
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
+
+# Verifying TLS context built once, so the CA bundle is loaded a single time
+_SSL_CONTEXT = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+_SSL_CONTEXT.check_hostname = True
+_SSL_CONTEXT.verify_mode = ssl.CERT_REQUIRED
+_SSL_CONTEXT.minimum_version = ssl.TLSVersion.TLSv1_2
+_SSL_CONTEXT.load_default_certs()
+
+# App marker, matched on the raw page bytes (only "react" is case-insensitive)
+_APP_MARKER = re.compile(rb'Passport Photo AI|(?i:react)')
 
 def check_dns_resolution(domain):
     """Check if domain resolves to an IP"""
@@ -21,63 +46,83 @@ def check_dns_resolution(domain):
         print(f"❌ DNS Resolution: {domain} does not resolve")
         return False
 
-def check_ssl_certificate(domain):
+def check_ssl_certificate(domain, log=print):
     """Check SSL certificate"""
     try:
-        context = ssl.create_default_context()
-        with socket.create_connection((domain, 443), timeout=10) as sock:
-            with context.wrap_socket(sock, server_hostname=domain) as ssock:
+        with socket.create_connection((domain, 443), timeout=5) as sock:
+            with _SSL_CONTEXT.wrap_socket(sock, server_hostname=domain) as ssock:
                 cert = ssock.getpeercert()
                 
-        print(f"✅ SSL Certificate: Valid")
-        print(f"   Issued to: {cert['subject'][0][0][1]}")
-        print(f"   Issued by: {cert['issuer'][1][0][1]}")
-        print(f"   Valid until: {cert['notAfter']}")
+        log(f"✅ SSL Certificate: Valid")
+        log(f"   Issued to: {cert['subject'][0][0][1]}")
+        log(f"   Issued by: {cert['issuer'][1][0][1]}")
+        log(f"   Valid until: {cert['notAfter']}")
         return True
     except Exception as e:
-        print(f"❌ SSL Certificate: {e}")
+        log(f"❌ SSL Certificate: {e}")
         return False
 
-def check_http_response(domain):
+def check_http_response(domain, log=print):
     """Check if website responds"""
     try:
         url = f"https://{domain}"
-        response = requests.get(url, timeout=10)
+        
+        # Size from the headers, so the body doesn't have to be downloaded
+        head = _SESSION.head(url, timeout=5, allow_redirects=True)
+        content_length = head.headers.get('Content-Length')
+        
+        # Only the first chunk of the page is needed to recognise the app
+        with _SESSION.get(url, stream=True, timeout=10) as response:
+            first_chunk = next(response.iter_content(chunk_size=16384), b'')
         
         if response.status_code == 200:
-            print(f"✅ HTTP Response: {response.status_code} OK")
-            print(f"   Content length: {len(response.content)} bytes")
+            log(f"✅ HTTP Response: {response.status_code} OK")
+            if content_length is not None:
+                log(f"   Content length: {content_length} bytes")
+            else:
+                log(f"   Content length: not reported by server")
             
             # Check if it's our React app
-            if "Passport Photo AI" in response.text or "react" in response.text.lower():
-                print(f"✅ App Detection: Passport Photo AI detected")
+            if _APP_MARKER.search(first_chunk):
+                log(f"✅ App Detection: Passport Photo AI detected")
             else:
-                print(f"⚠️  App Detection: May not be our app")
+                log(f"⚠️  App Detection: May not be our app")
             
             return True
         else:
-            print(f"❌ HTTP Response: {response.status_code}")
+            log(f"❌ HTTP Response: {response.status_code}")
             return False
     except Exception as e:
-        print(f"❌ HTTP Response: {e}")
+        log(f"❌ HTTP Response: {e}")
         return False
 
-def check_dns_propagation(domain):
-    """Check DNS propagation using dig"""
+def check_dns_propagation(domain, log=print):
+    """Check DNS propagation (dnspython against public resolvers, dig as a fallback)"""
     try:
-        result = subprocess.run(['dig', '+short', domain], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0 and result.stdout.strip():
-            ips = result.stdout.strip().split('\n')
-            print(f"✅ DNS Propagation: {len(ips)} record(s) found")
+        if DNSPYTHON_AVAILABLE:
+            # Resolve in-process instead of forking dig and parsing its output
+            resolver = dns.resolver.Resolver()
+            resolver.nameservers = ['8.8.8.8', '1.1.1.1']
+            resolver.lifetime = 5
+            try:
+                ips = [answer.address for answer in resolver.resolve(domain, 'A')]
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                ips = []
+        else:
+            result = subprocess.run(['dig', '+short', domain], 
+                                  capture_output=True, text=True, timeout=10)
+            ips = result.stdout.strip().split('\n') if result.returncode == 0 and result.stdout.strip() else []
+        
+        if ips:
+            log(f"✅ DNS Propagation: {len(ips)} record(s) found")
             for ip in ips:
-                print(f"   → {ip}")
+                log(f"   → {ip}")
             return True
         else:
-            print(f"❌ DNS Propagation: No records found")
+            log(f"❌ DNS Propagation: No records found")
             return False
     except Exception as e:
-        print(f"⚠️  DNS Propagation: Could not check ({e})")
+        log(f"⚠️  DNS Propagation: Could not check ({e})")
         return None
 
 def main():
@@ -95,11 +140,29 @@ def main():
     print(f"\n🔍 Checking: {domain}")
     print("-" * 30)
     
-    # Run checks
+    # Run checks: SSL and HTTP need DNS, after that the network checks are
+    # independent, so run them concurrently and print each one's output in order
     dns_ok = check_dns_resolution(domain)
-    propagation_ok = check_dns_propagation(domain)
-    ssl_ok = check_ssl_certificate(domain) if dns_ok else False
-    http_ok = check_http_response(domain) if dns_ok else False
+    
+    dependent_checks = [check_dns_propagation]
+    if dns_ok:
+        dependent_checks += [check_ssl_certificate, check_http_response]
+    
+    with ThreadPoolExecutor(max_workers=len(dependent_checks)) as executor:
+        futures = []
+        for check in dependent_checks:
+            lines = []
+            futures.append((executor.submit(check, domain, lines.append), lines))
+        
+        outcomes = []
+        for future, lines in futures:
+            outcome = future.result()
+            for line in lines:
+                print(line)
+            outcomes.append(outcome)
+    
+    outcomes += [False] * (3 - len(outcomes))
+    propagation_ok, ssl_ok, http_ok = outcomes
     
     # Summary
     print("\n" + "=" * 50)
@@ -6,6 +6,7 @@ Ensures everything is ready for AWS deployment
 
 import os
 import json
+import py_compile
 import subprocess
 import sys
 
@@ -16,11 +17,17 @@ def check_backend_ready():
     
     checks = []
     
-    # Check if application.py exists and imports correctly
+    # Check if application.py exists and imports correctly. Parse it here, but do
+    # the real import in a child process so model loading never lands in this one
     try:
-        sys.path.append('backend')
-        import application
-        checks.append(("✅", "Backend imports successfully"))
+        py_compile.compile('backend/application.py', doraise=True)
+        result = subprocess.run([sys.executable, '-c', 'import application'],
+                                cwd='backend', capture_output=True, text=True, timeout=30)
+        if result.returncode == 0:
+            checks.append(("✅", "Backend imports successfully"))
+        else:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}"
+            checks.append(("❌", f"Backend import failed: {error}"))
     except Exception as e:
         checks.append(("❌", f"Backend import failed: {e}"))
     
@@ -51,6 +58,14 @@ def check_backend_ready():
     
     return all(status == "✅" for status, _ in checks if status != "⚠️")
 
+def _dir_entries(path):
+    """Names in a directory from a single scandir (empty if it does not exist)"""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
 def check_frontend_ready():
     """Check if frontend is ready for deployment"""
     print("\n🔍 CHECKING FRONTEND READINESS")
@@ -58,12 +73,15 @@ def check_frontend_ready():
     
     checks = []
     
+    # One directory read instead of a stat per file
+    frontend_entries = _dir_entries('frontend')
+    
     # Check if build exists
-    if os.path.exists('frontend/build'):
+    if 'build' in frontend_entries:
         checks.append(("✅", "Frontend build directory exists"))
         
         # Check if index.html exists in build
-        if os.path.exists('frontend/build/index.html'):
+        if 'index.html' in _dir_entries('frontend/build'):
             checks.append(("✅", "index.html exists in build"))
         else:
             checks.append(("❌", "index.html missing in build"))
@@ -71,13 +89,13 @@ def check_frontend_ready():
         checks.append(("❌", "Frontend build directory missing"))
     
     # Check if deployment zip exists
-    if os.path.exists('frontend/passport-photo-frontend.zip'):
+    if 'passport-photo-frontend.zip' in frontend_entries:
         checks.append(("✅", "Deployment zip created"))
     else:
         checks.append(("❌", "Deployment zip missing"))
     
     # Check package.json
-    if os.path.exists('frontend/package.json'):
+    if 'package.json' in frontend_entries:
         with open('frontend/package.json', 'r') as f:
             package_data = json.load(f)
             if 'build' in package_data.get('scripts', {}):
@@ -88,7 +106,7 @@ def check_frontend_ready():
         checks.append(("❌", "package.json missing"))
     
     # Check amplify.yml
-    if os.path.exists('frontend/amplify.yml'):
+    if 'amplify.yml' in frontend_entries:
         checks.append(("✅", "amplify.yml configuration exists"))
     else:
         checks.append(("❌", "amplify.yml missing"))
@@ -111,8 +129,9 @@ def check_deployment_scripts():
         'DEPLOYMENT_GUIDE.md'
     ]
     
+    root_entries = _dir_entries('.')
     for script in scripts:
-        if os.path.exists(script):
+        if script in root_entries:
             checks.append(("✅", f"{script} exists"))
         else:
             checks.append(("❌", f"{script} missing"))
@@ -5,21 +5,114 @@ This will help us debug the intelligent cropping issues
 """
 
 import requests
+import urllib3
 import base64
+import hashlib
 import json
 import os
+import sys
 from PIL import Image
 import io
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
-def prepare_image_for_testing(image_path):
-    """Prepare image for testing by ensuring it meets minimum resolution requirements"""
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    from requests_toolbelt.multipart.decoder import MultipartDecoder
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
+try:
+    from pic_scale import resize as ps_resize, Resampling
+    PIC_SCALE_AVAILABLE = True
+except ImportError:
+    PIC_SCALE_AVAILABLE = False
+
+# Connection pools accept a blocksize only from urllib3 2.0 on
+URLLIB3_SUPPORTS_BLOCKSIZE = int(urllib3.__version__.split('.')[0]) >= 2
+
+class LargeBlockAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections send file-like bodies in 64 KiB blocks (urllib3 2.x;
+    on urllib3 1.26 it behaves like a plain HTTPAdapter)
+    
+    Only streamed bodies (such as a MultipartEncoder) are read in blocksize
+    pieces; a body already built as bytes goes to sendall in one call.
+    """
+    
+    def init_poolmanager(self, *args, **kwargs):
+        # urllib3 1.26 pools have no blocksize key and would reject the argument
+        if URLLIB3_SUPPORTS_BLOCKSIZE:
+            kwargs.setdefault('blocksize', 65536)
+        super().init_poolmanager(*args, **kwargs)
+
+# One keep-alive session shared by every upload
+SESSION = requests.Session()
+SESSION.mount('http://', LargeBlockAdapter())
+SESSION.mount('https://', LargeBlockAdapter())
+
+def read_json_response(response):
+    """Parse a JSON object response; streamed straight off the socket with ijson when available"""
+    if IJSON_AVAILABLE:
+        # Build the dict key by key from the raw stream, so the body is never
+        # held as one bytes/str buffer alongside the parsed result
+        response.raw.decode_content = True
+        return dict(ijson.kvitems(response.raw, '', use_float=True))
+    return response.json()
+
+def read_multipart_response(response):
+    """Split a multipart reply into (analysis dict, raw processed image bytes)"""
+    result, image_bytes = {}, None
+    decoder = MultipartDecoder(response.content, response.headers['Content-Type'])
+    for part in decoder.parts:
+        part_type = part.headers.get(b'Content-Type', b'').decode('latin-1')
+        if part_type.startswith('application/json'):
+            result = json.loads(part.content)
+        elif part_type.startswith('image/'):
+            image_bytes = part.content
+    return result, image_bytes
+
+# Resized test inputs from earlier runs, keyed by source path, mtime and size
+PREPARED_CACHE_DIR = '.cache_prepared'
+
+# Image modes pic_scale can resample directly; anything else is converted to RGB first
+PIC_SCALE_MODES = {'L', 'LA', 'RGB', 'RGBA', 'I;16', 'F'}
+
+def prepare_image_for_testing(image_path, log=print):
+    """Prepare image for testing by ensuring it meets minimum resolution requirements
+    
+    Returns (image, upload) where upload is a binary file object, positioned at
+    the start, holding the bytes to send; the caller closes it.
+    """
     
     img = Image.open(image_path)
     width, height = img.size
     
     # Check if image meets minimum resolution (400x400)
     if width >= 400 and height >= 400:
-        return img, image_path
+        return img, open(image_path, 'rb')
+    
+    # Reuse the resized copy from a previous run while the source is unchanged
+    stat = os.stat(image_path)
+    key = hashlib.blake2b(f"{image_path}:{stat.st_mtime}:{stat.st_size}".encode()).hexdigest()[:16]
+    extension = os.path.splitext(image_path)[1].lower() or '.png'
+    cache_path = os.path.join(PREPARED_CACHE_DIR, key + extension)
+    if os.path.exists(cache_path):
+        cached_img = Image.open(cache_path)
+        log(f"📏 Using cached resize {img.size} → {cached_img.size}")
+        return cached_img, open(cache_path, 'rb')
     
     # Resize image to meet minimum requirements while maintaining aspect ratio
     min_size = 600  # Use 600 to be safe
@@ -38,142 +131,180 @@ def prepare_image_for_testing(image_path):
     if new_height < min_size:
         new_height = min_size
     
-    # Resize image
-    resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    # Resize image (multithreaded SIMD Lanczos when pic_scale is installed)
+    if PIC_SCALE_AVAILABLE:
+        source = img if img.mode in PIC_SCALE_MODES else img.convert('RGB')
+        resized_img = ps_resize(source, (new_width, new_height), Resampling.LANCZOS, workers=0)
+    else:
+        resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    
+    # Encode the resized image in memory (same format as the source) instead of a temp file
+    upload = io.BytesIO()
+    resized_img.save(upload, format=img.format or 'PNG', quality=95)
+    upload.seek(0)
     
-    # Save temporary resized image
-    temp_path = f"temp_resized_{os.path.basename(image_path)}"
-    resized_img.save(temp_path, quality=95)
+    # Keep a copy for the next run (written to a temp name, then renamed into place)
+    try:
+        os.makedirs(PREPARED_CACHE_DIR, exist_ok=True)
+        partial_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(partial_path, 'wb') as f:
+            f.write(upload.getbuffer())
+        os.replace(partial_path, cache_path)
+    except OSError as e:
+        log(f"⚠️  Could not cache resized image: {e}")
     
-    print(f"📏 Resized {img.size} → {resized_img.size} to meet minimum resolution")
+    log(f"📏 Resized {img.size} → {resized_img.size} to meet minimum resolution")
     
-    return resized_img, temp_path
+    return resized_img, upload
 
-def test_api_with_image(image_path, api_url="http://localhost:5001/api/full-workflow"):
+def test_api_with_image(image_path, api_url="http://localhost:5001/api/full-workflow", log=print, save=True):
     """Test the API with a specific image"""
     
     if not os.path.exists(image_path):
-        print(f"❌ Image not found: {image_path}")
+        log(f"❌ Image not found: {image_path}")
         return None
     
-    print(f"\n📸 TESTING: {os.path.basename(image_path)}")
-    print("-" * 60)
+    log(f"\n📸 TESTING: {os.path.basename(image_path)}")
+    log("-" * 60)
     
     # Prepare image for testing (resize if needed)
-    img, test_path = prepare_image_for_testing(image_path)
-    print(f"📐 Test image size: {img.size}")
-    print(f"📊 Test image mode: {img.mode}")
-    
-    temp_file_created = test_path != image_path
+    img, upload = prepare_image_for_testing(image_path, log)
+    img_width, img_height = img.size
+    log(f"📐 Test image size: {(img_width, img_height)}")
+    log(f"📊 Test image mode: {img.mode}")
     
     try:
         # Prepare the request
-        with open(test_path, 'rb') as f:
-            files = {'image': f}
+        with upload:
+            files = {'image': (os.path.basename(image_path), upload)}
             data = {
                 'remove_background': 'true',  # Test with background removal
                 'use_learned_profile': 'true'
             }
             
-            print(f"🔗 Calling API: {api_url}")
-            response = requests.post(api_url, files=files, data=data, timeout=30)
+            log(f"🔗 Calling API: {api_url}")
+            if TOOLBELT_AVAILABLE:
+                # Stream the multipart body so it is sent in 64 KiB reads instead of
+                # being assembled in memory, and offer a binary multipart reply (no base64)
+                encoder = MultipartEncoder(fields={**data, **files})
+                headers = {'Content-Type': encoder.content_type,
+                           'Accept': 'multipart/mixed, application/json'}
+                response = SESSION.post(api_url, data=encoder, headers=headers,
+                                        timeout=30, stream=True)
+            else:
+                response = SESSION.post(api_url, files=files, data=data,
+                                        timeout=30, stream=True)
         
         if response.status_code == 200:
-            result = response.json()
+            processed_data = None
+            if TOOLBELT_AVAILABLE and response.headers.get('Content-Type', '').startswith('multipart/'):
+                result, processed_data = read_multipart_response(response)
+            else:
+                result = read_json_response(response)
             
-            print("✅ API call successful!")
-            print(f"🎯 Success: {result.get('success', False)}")
-            print(f"⏱️  Processing time: {result.get('processing_time', 0):.2f}s")
-            print(f"✂️  Intelligent cropping used: {result.get('intelligent_cropping_used', False)}")
+            log("✅ API call successful!")
+            log(f"🎯 Success: {result.get('success', False)}")
+            log(f"⏱️  Processing time: {result.get('processing_time', 0):.2f}s")
+            log(f"✂️  Intelligent cropping used: {result.get('intelligent_cropping_used', False)}")
             
             # Print full response for debugging
             if not result.get('success', False):
-                print(f"⚠️  API returned success=False")
-                print(f"📄 Full response: {json.dumps(result, indent=2)}")
+                log(f"⚠️  API returned success=False")
+                log(f"📄 Full response: {json.dumps(result, indent=2)}")
             
             # Face detection analysis
             analysis = result.get('analysis')
             if analysis is None:
-                print("❌ No analysis data in response")
+                log("❌ No analysis data in response")
                 return result
                 
             face_detection = analysis.get('face_detection', {})
             if face_detection:
-                print(f"\n👤 FACE DETECTION:")
-                print(f"   Faces detected: {face_detection.get('faces_detected', 0)}")
-                print(f"   Valid: {face_detection.get('valid', False)}")
-                print(f"   Confidence: {face_detection.get('confidence', 0):.1%}")
-                print(f"   Head height: {face_detection.get('head_height_percent', 0):.1%}")
-                print(f"   Eyes detected: {face_detection.get('eyes_detected', 0)}")
+                log(f"\n👤 FACE DETECTION:")
+                log(f"   Faces detected: {face_detection.get('faces_detected', 0)}")
+                log(f"   Valid: {face_detection.get('valid', False)}")
+                log(f"   Confidence: {face_detection.get('confidence', 0):.1%}")
+                log(f"   Head height: {face_detection.get('head_height_percent', 0):.1%}")
+                log(f"   Eyes detected: {face_detection.get('eyes_detected', 0)}")
                 
                 if face_detection.get('error'):
-                    print(f"   ⚠️  Error: {face_detection['error']}")
+                    log(f"   ⚠️  Error: {face_detection['error']}")
             
             # AI Analysis
             ai_analysis = analysis.get('ai_analysis', {})
             if ai_analysis:
-                print(f"\n🤖 AI ANALYSIS:")
-                print(f"   Compliant: {ai_analysis.get('compliant', False)}")
+                log(f"\n🤖 AI ANALYSIS:")
+                log(f"   Compliant: {ai_analysis.get('compliant', False)}")
                 issues = ai_analysis.get('issues', [])
                 if issues:
-                    print(f"   Issues: {len(issues)}")
+                    log(f"   Issues: {len(issues)}")
                     for issue in issues:
-                        print(f"     • {issue}")
+                        log(f"     • {issue}")
                 
                 # Intelligent cropping info
                 cropping_info = ai_analysis.get('intelligent_cropping', {})
                 if cropping_info:
-                    print(f"\n✂️  INTELLIGENT CROPPING:")
-                    print(f"   Analysis performed: {cropping_info.get('analysis_performed', False)}")
-                    print(f"   Cropping applied: {cropping_info.get('cropping_applied', False)}")
+                    log(f"\n✂️  INTELLIGENT CROPPING:")
+                    log(f"   Analysis performed: {cropping_info.get('analysis_performed', False)}")
+                    log(f"   Cropping applied: {cropping_info.get('cropping_applied', False)}")
                     
                     if cropping_info.get('compliance_score') is not None:
-                        print(f"   Compliance score: {cropping_info['compliance_score']:.1%}")
+                        log(f"   Compliance score: {cropping_info['compliance_score']:.1%}")
                     
                     if cropping_info.get('actions_taken'):
-                        print(f"   Actions taken: {', '.join(cropping_info['actions_taken'])}")
+                        log(f"   Actions taken: {', '.join(cropping_info['actions_taken'])}")
                     
                     if cropping_info.get('reason'):
-                        print(f"   Reason: {cropping_info['reason']}")
+                        log(f"   Reason: {cropping_info['reason']}")
             
             # Save processed image
-            if result.get('processed_image'):
+            if processed_data is not None or result.get('processed_image'):
                 try:
-                    processed_data = base64.b64decode(result['processed_image'])
+                    if processed_data is None:
+                        # SIMD base64 decoder when installed; the payload is plain base64 either way
+                        b64 = pybase64 if PYBASE64_AVAILABLE else base64
+                        processed_data = b64.b64decode(result['processed_image'], validate=True)
+                    # Image.open only parses the header; size and mode need no pixel decode
                     processed_img = Image.open(io.BytesIO(processed_data))
+                    processed_width, processed_height = processed_img.size
                     
-                    output_name = f"api_test_result_{os.path.basename(image_path)}"
-                    processed_img.save(output_name, quality=95)
+                    log(f"\n💾 PROCESSED IMAGE:")
+                    log(f"   Size: {(processed_width, processed_height)}")
+                    log(f"   Mode: {processed_img.mode}")
                     
-                    print(f"\n💾 PROCESSED IMAGE:")
-                    print(f"   Size: {processed_img.size}")
-                    print(f"   Mode: {processed_img.mode}")
-                    print(f"   Saved as: {output_name}")
+                    if save:
+                        # Always write a JPEG diagnostic copy (PNG inputs would otherwise pay for deflate)
+                        output_name = f"api_test_result_{os.path.splitext(os.path.basename(image_path))[0]}.jpg"
+                        if processed_img.format == 'JPEG':
+                            # Already a JPEG: write the returned bytes, no decode/re-encode
+                            with open(output_name, 'wb') as f:
+                                f.write(processed_data)
+                        else:
+                            processed_img.convert('RGB').save(output_name, format='JPEG', quality=85, optimize=False)
+                        log(f"   Saved as: {output_name}")
                     
                     # Compare sizes
-                    size_change = (processed_img.width * processed_img.height) / (img.width * img.height)
-                    print(f"   Size change: {size_change:.2f}x")
+                    size_change = (processed_width * processed_height) / (img_width * img_height)
+                    log(f"   Size change: {size_change:.2f}x")
                     
                 except Exception as e:
-                    print(f"❌ Failed to save processed image: {e}")
+                    log(f"❌ Failed to save processed image: {e}")
             
             return result
             
         else:
-            print(f"❌ API call failed: {response.status_code}")
-            print(f"Response: {response.text}")
+            log(f"❌ API call failed: {response.status_code}")
+            log(f"Response: {response.text}")
             return None
             
     except Exception as e:
-        print(f"❌ Error testing image: {e}")
+        log(f"❌ Error testing image: {e}")
         return None
-    finally:
-        # Clean up temporary resized file if created
-        if temp_file_created and os.path.exists(test_path):
-            os.remove(test_path)
 
 def main():
-    """Test all images in backend/test_images/"""
+    """Test all images in backend/test_images/ (pass --no-save to only report metadata)"""
+    
+    save = '--no-save' not in sys.argv[1:]
     
     print("🧪 TESTING WEB API WITH REAL IMAGES")
     print("=" * 80)
@@ -188,8 +319,18 @@ def main():
     
     results = []
     
-    for img_path in test_images:
-        result = test_api_with_image(img_path)
+    def run_buffered(img_path):
+        # Collect each image's output so concurrent runs don't interleave
+        lines = []
+        return test_api_with_image(img_path, log=lines.append, save=save), lines
+    
+    # The calls wait on the server, not the CPU, so send them all at once
+    with ThreadPoolExecutor(max_workers=len(test_images)) as executor:
+        outcomes = list(executor.map(run_buffered, test_images))
+    
+    for img_path, (result, lines) in zip(test_images, outcomes):
+        for line in lines:
+            print(line)
         if result:
             results.append({
                 'image': os.path.basename(img_path),
@@ -213,7 +354,10 @@ def main():
         print(f"{status} {result['image']}")
         print(f"   {cropping} Cropping | {face} Face | {ai} AI | ⏱️ {result['processing_time']:.1f}s")
     
-    print(f"\n✅ Testing completed! Check api_test_result_*.jpg files for processed images.")
+    if save:
+        print(f"\n✅ Testing completed! Check api_test_result_*.jpg files for processed images.")
+    else:
+        print(f"\n✅ Testing completed!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file